@@ -0,0 +1,95 @@
+/*
+ * Noyau de recherche du plus proche encodage de visage, vectorisé AVX2.
+ *
+ * Compilation (optionnelle, le code Python se replie sur NumPy/Numba):
+ *   cc -O3 -march=native -fno-math-errno -shared -fPIC -o _match.so _match.c
+ *
+ * Paramètres:
+ *   K  : matrice (n, 128) float32 contiguë des encodages connus
+ *   n  : nombre d'encodages connus
+ *   q  : encodage requête (128) float32
+ *   bi : indice du meilleur match (sortie)
+ *   bd : distance carrée du meilleur match (sortie)
+ */
+#include <stddef.h>
+
+#if defined(__AVX2__) && defined(__FMA__)
+#include <immintrin.h>
+
+void best_match(const float *K, size_t n, const float *q,
+                int *bi, float *bd)
+{
+    /* La requête tient dans 16 registres __m256, chargés une seule fois */
+    __m256 qv[16];
+    int j;
+    for (j = 0; j < 16; j++)
+        qv[j] = _mm256_loadu_ps(q + 8 * j);
+
+    float best_d = 1e30f;
+    int best_i = -1;
+
+    for (size_t i = 0; i < n; i++) {
+        const float *row = K + 128 * i;
+
+        /* 4 accumulateurs indépendants pour masquer la latence des FMA */
+        __m256 acc0 = _mm256_setzero_ps();
+        __m256 acc1 = _mm256_setzero_ps();
+        __m256 acc2 = _mm256_setzero_ps();
+        __m256 acc3 = _mm256_setzero_ps();
+
+        for (j = 0; j < 16; j += 4) {
+            __m256 d0 = _mm256_sub_ps(_mm256_loadu_ps(row + 8 * j), qv[j]);
+            __m256 d1 = _mm256_sub_ps(_mm256_loadu_ps(row + 8 * (j + 1)), qv[j + 1]);
+            __m256 d2 = _mm256_sub_ps(_mm256_loadu_ps(row + 8 * (j + 2)), qv[j + 2]);
+            __m256 d3 = _mm256_sub_ps(_mm256_loadu_ps(row + 8 * (j + 3)), qv[j + 3]);
+            acc0 = _mm256_fmadd_ps(d0, d0, acc0);
+            acc1 = _mm256_fmadd_ps(d1, d1, acc1);
+            acc2 = _mm256_fmadd_ps(d2, d2, acc2);
+            acc3 = _mm256_fmadd_ps(d3, d3, acc3);
+        }
+
+        /* Réduction horizontale des 4 accumulateurs */
+        __m256 acc = _mm256_add_ps(_mm256_add_ps(acc0, acc1),
+                                   _mm256_add_ps(acc2, acc3));
+        __m128 s = _mm_add_ps(_mm256_castps256_ps128(acc),
+                              _mm256_extractf128_ps(acc, 1));
+        s = _mm_hadd_ps(s, s);
+        s = _mm_hadd_ps(s, s);
+        float d = _mm_cvtss_f32(s);
+
+        if (d < best_d) {
+            best_d = d;
+            best_i = (int)i;
+        }
+    }
+
+    *bi = best_i;
+    *bd = best_d;
+}
+
+#else /* repli scalaire si AVX2/FMA indisponibles */
+
+void best_match(const float *K, size_t n, const float *q,
+                int *bi, float *bd)
+{
+    float best_d = 1e30f;
+    int best_i = -1;
+
+    for (size_t i = 0; i < n; i++) {
+        const float *row = K + 128 * i;
+        float d = 0.0f;
+        for (int j = 0; j < 128; j++) {
+            float t = row[j] - q[j];
+            d += t * t;
+        }
+        if (d < best_d) {
+            best_d = d;
+            best_i = (int)i;
+        }
+    }
+
+    *bi = best_i;
+    *bd = best_d;
+}
+
+#endif
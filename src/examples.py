@@ -5,7 +5,7 @@ Script d'exemple pour démontrer l'utilisation du système
 """
 
 from face_recognition_system import FaceRecognitionSystem
-from utils import get_image_quality
+from utils import cached_image_quality
 import cv2
 
 
@@ -16,7 +16,7 @@ def exemple_analyse_qualite():
     image_path = input("Chemin de l'image à analyser: ").strip()
     
     try:
-        quality = get_image_quality(image_path)
+        quality = cached_image_quality(image_path)
         
         print(f"\n📊 Résultats:")
         print(f"  Luminosité: {quality['brightness']:.1f}/255")
@@ -48,7 +48,7 @@ def exemple_reconnaissance_batch():
     
     system = FaceRecognitionSystem(known_faces_dir="known_faces")
     
-    if not system.known_face_encodings:
+    if not system.known_face_names:
         print("❌ Aucun visage connu. Enregistrez des visages d'abord.")
         return
     
@@ -85,7 +85,7 @@ def exemple_statistiques():
     
     system = FaceRecognitionSystem(known_faces_dir="known_faces")
     
-    if not system.known_face_encodings:
+    if not system.known_face_names:
         print("❌ Aucun visage connu.")
         return
     
@@ -93,7 +93,7 @@ def exemple_statistiques():
     from collections import Counter
     counts = Counter(system.known_face_names)
     
-    print(f"📊 Nombre total de visages: {len(system.known_face_encodings)}")
+    print(f"📊 Nombre total de visages: {len(system.known_face_names)}")
     print(f"👥 Nombre de personnes: {len(counts)}")
     print(f"\n📋 Détails:")
     
@@ -5,13 +5,175 @@ Système de reconnaissance faciale en temps réel
 Utilise la webcam pour détecter et reconnaître les visages
 """
 
+import ctypes
 import cv2
+import dlib
 import face_recognition
 import numpy as np
 import os
-import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Taille de galerie à partir de laquelle le pré-filtre int8 s'active,
+# et nombre de candidats conservés pour le re-classement exact
+INT8_PREFILTER_MIN_N = 4096
+INT8_PREFILTER_TOP = 32
+
+# Écart moyen (niveaux de gris, image 32x32) en dessous duquel la scène
+# est considérée comme statique et la détection précédente réutilisée
+FRAME_DIFF_THRESHOLD = 4.0
+
+# Nombre de frames accumulées avant une passe CNN batchée sur GPU
+GPU_BATCH_SIZE = 8
+
+# Taille de galerie à partir de laquelle l'index FAISS est construit
+FAISS_MIN_N = 1024
+
+# Numba est optionnel: sans lui, on retombe sur le chemin NumPy/BLAS
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# FAISS est optionnel: index de plus proches voisins pour les grandes
+# galeries, avec repli sur le balayage exact sinon
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Noyau C AVX2 optionnel (voir _match.c pour la ligne de compilation);
+# sans lui, les chemins Numba/NumPy ci-dessous prennent le relais
+_MATCH_LIB = None
+_match_so = Path(__file__).parent / "_match.so"
+if _match_so.exists():
+    try:
+        _MATCH_LIB = ctypes.CDLL(str(_match_so))
+        _MATCH_LIB.best_match.argtypes = [
+            ctypes.POINTER(ctypes.c_float), ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_float),
+        ]
+        _MATCH_LIB.best_match.restype = None
+    except (OSError, AttributeError):
+        _MATCH_LIB = None
+
+
+def _best_match_native(known_matrix, query):
+    """
+    Appelle le noyau C best_match (voir _match.c)
+
+    Args:
+        known_matrix: Matrice (N, 128) float32 C-contiguë
+        query: Encodage requête (128,) float32 contigu
+
+    Returns:
+        tuple: (indice du meilleur match, distance carrée)
+    """
+    best_i = ctypes.c_int(-1)
+    best_d = ctypes.c_float(0.0)
+    _MATCH_LIB.best_match(
+        known_matrix.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+        ctypes.c_size_t(len(known_matrix)),
+        query.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+        ctypes.byref(best_i), ctypes.byref(best_d)
+    )
+    return best_i.value, best_d.value
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _best_match(known_matrix, query):
+        """
+        Trouve l'encodage connu le plus proche d'une requête
+
+        Args:
+            known_matrix: Matrice (N, 128) float32 des encodages connus
+            query: Encodage requête (128,) float32
+
+        Returns:
+            tuple: (indice du meilleur match, distance carrée)
+        """
+        n = known_matrix.shape[0]
+        d2 = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            s = np.float32(0.0)
+            for j in range(query.shape[0]):
+                d = known_matrix[i, j] - query[j]
+                s += d * d
+            d2[i] = s
+        best = np.argmin(d2)
+        return best, d2[best]
+
+
+# Taille des lots passés à dlib pour le calcul des descripteurs
+ENCODE_BATCH_SIZE = 32
+
+
+def _detect_one(job):
+    """
+    Charge une image et détecte le premier visage (processus worker)
+
+    Args:
+        job: Tuple (nom de la personne, chemin de l'image)
+
+    Returns:
+        tuple: (nom, image ou None, localisation ou None, nom du fichier)
+    """
+    person_name, image_path = job
+    try:
+        image = face_recognition.load_image_file(str(image_path))
+        locations = face_recognition.face_locations(image)
+        location = locations[0] if locations else None
+        return person_name, image, location, image_path.name
+    except Exception as e:
+        print(f"    ✗ Erreur avec {image_path.name}: {e}")
+        return person_name, None, None, image_path.name
+
+
+class _Grabber:
+    """Thread d'acquisition qui conserve toujours la dernière image webcam"""
+
+    def __init__(self, capture):
+        """
+        Args:
+            capture: Objet cv2.VideoCapture déjà ouvert
+        """
+        self.capture = capture
+        self.lock = threading.Lock()
+        self.latest = None
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        """Boucle d'acquisition (exécutée dans le thread démon)"""
+        while self.running:
+            ret, frame = self.capture.read()
+            if not ret:
+                # Effacer la dernière image: la boucle principale voit
+                # alors None et peut signaler la perte de la caméra au
+                # lieu de tourner sur une image figée
+                with self.lock:
+                    self.latest = None
+                self.running = False
+                break
+            with self.lock:
+                self.latest = frame
+
+    def read_latest(self):
+        """Retourne une copie de la dernière image capturée (ou None)"""
+        with self.lock:
+            return None if self.latest is None else self.latest.copy()
+
+    def stop(self):
+        """Arrête le thread d'acquisition"""
+        self.running = False
+        self.thread.join(timeout=1.0)
+
 
 class FaceRecognitionSystem:
     """Système de reconnaissance faciale"""
@@ -26,26 +188,75 @@ class FaceRecognitionSystem:
         """
         self.known_faces_dir = Path(known_faces_dir)
         self.tolerance = tolerance
-        self.known_face_encodings = []
         self.known_face_names = []
-        self.encodings_file = "face_encodings.pkl"
-        
+        self.encodings_file = "face_encodings.npy"
+        self.names_file = "face_names.npy"
+
+        # Matrice contiguë (N, 128) en float32 pour les calculs de distance vectorisés
+        self.known_encodings_matrix = np.empty((0, 128), dtype=np.float32)
+        self.known_face_names_arr = np.empty(0, dtype=object)
+
+        # Cache de la barrière de contenu (réutilisé si la scène est statique)
+        self._last_tiny_gray = None
+        self._last_detection = ([], [])
+
+        # Détection CNN batchée sur GPU si dlib a été compilé avec CUDA
+        self.use_gpu = bool(getattr(dlib, 'DLIB_USE_CUDA', False))
+
+        # Étiquettes "Nom (xx%)" déjà construites, pour éviter de
+        # formater les mêmes chaînes à chaque frame
+        self._label_cache = {}
+
         # Charger les visages connus
         self.load_known_faces()
     
     def load_known_faces(self):
         """Charge les encodages des visages connus depuis le fichier ou les crée"""
         # Vérifier si un fichier d'encodages existe
-        if os.path.exists(self.encodings_file):
+        if os.path.exists(self.encodings_file) and os.path.exists(self.names_file):
             print("📂 Chargement des encodages depuis le fichier...")
-            with open(self.encodings_file, 'rb') as f:
-                data = pickle.load(f)
-                self.known_face_encodings = data['encodings']
-                self.known_face_names = data['names']
+            # mmap: la matrice est paginée par l'OS, pas désérialisée
+            self.known_encodings_matrix = np.load(self.encodings_file, mmap_mode='r')
+            self.known_face_names_arr = np.load(self.names_file, allow_pickle=True)
+            self.known_face_names = list(self.known_face_names_arr)
+            self._precompute_match_state()
             print(f"✓ {len(self.known_face_names)} visages chargés")
         else:
             print("🔍 Création des encodages des visages connus...")
             self.encode_known_faces()
+
+    def _precompute_match_state(self):
+        """Précalcule les structures dérivées de la matrice d'encodages"""
+        matrix = self.known_encodings_matrix
+
+        # Normes carrées des encodages connus, précalculées pour le calcul
+        # de distance en une seule multiplication matricielle (BLAS)
+        self._k_sq = np.einsum('ij,ij->i', matrix, matrix)
+
+        # Version quantifiée pour le pré-filtre entier sur grandes
+        # galeries: l'opérande transposé est élargi en int32 une seule
+        # fois ici (le faire à chaque frame copierait toute la galerie),
+        # et les normes carrées quantifiées permettent de classer par
+        # ||k||² - 2 q·k, un vrai ordre de distance à une constante près
+        if matrix.size:
+            self._q_scale = float(np.abs(matrix).max()) / 127.0 or 1.0
+            k_int8 = np.clip(
+                np.round(matrix / self._q_scale), -127, 127
+            ).astype(np.int8)
+            k_int32 = k_int8.astype(np.int32)
+            self._k_int8_t = np.ascontiguousarray(k_int32.T)
+            self._k_int8_sq = np.einsum('ij,ij->i', k_int32, k_int32)
+        else:
+            self._q_scale = 1.0
+            self._k_int8_t = np.empty((128, 0), dtype=np.int32)
+            self._k_int8_sq = np.empty(0, dtype=np.int32)
+
+        # Index FAISS pour les grandes galeries: IndexFlatL2 reste un
+        # balayage exact, mais ses noyaux SIMD battent le chemin BLAS
+        self._faiss_index = None
+        if FAISS_AVAILABLE and len(matrix) >= FAISS_MIN_N:
+            self._faiss_index = faiss.IndexFlatL2(matrix.shape[1])
+            self._faiss_index.add(np.ascontiguousarray(matrix))
     
     def encode_known_faces(self):
         """Encode tous les visages du répertoire known_faces"""
@@ -56,41 +267,104 @@ class FaceRecognitionSystem:
             return
         
         image_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-        
-        for person_dir in self.known_faces_dir.iterdir():
-            if person_dir.is_dir():
-                person_name = person_dir.name
-                print(f"  Traitement de {person_name}...")
-                
-                for image_path in person_dir.iterdir():
-                    if image_path.suffix.lower() in image_extensions:
-                        try:
-                            # Charger l'image
-                            image = face_recognition.load_image_file(str(image_path))
-                            
-                            # Obtenir l'encodage du visage
-                            face_encodings = face_recognition.face_encodings(image)
-                            
-                            if face_encodings:
-                                # Prendre le premier visage trouvé
-                                self.known_face_encodings.append(face_encodings[0])
-                                self.known_face_names.append(person_name)
-                                print(f"    ✓ {image_path.name}")
-                            else:
-                                print(f"    ⚠️ Aucun visage détecté dans {image_path.name}")
-                        except Exception as e:
-                            print(f"    ✗ Erreur avec {image_path.name}: {e}")
-        
-        # Sauvegarder les encodages
-        if self.known_face_encodings:
-            with open(self.encodings_file, 'wb') as f:
-                pickle.dump({
-                    'encodings': self.known_face_encodings,
-                    'names': self.known_face_names
-                }, f)
-            print(f"✓ {len(self.known_face_encodings)} encodages sauvegardés")
+
+        # Lister toutes les images à encoder
+        jobs = [
+            (person_dir.name, image_path)
+            for person_dir in self.known_faces_dir.iterdir() if person_dir.is_dir()
+            for image_path in person_dir.iterdir()
+            if image_path.suffix.lower() in image_extensions
+        ]
+
+        if not jobs:
+            print("⚠️ Aucun visage n'a été encodé")
+            self._precompute_match_state()
+            return
+
+        # Écriture incrémentale: la matrice est préallouée sur disque et
+        # mémoire-mappée, puis remplie lot par lot — la RAM reste bornée
+        # par la taille d'un lot et une interruption ne perd pas le
+        # travail déjà écrit
+        self._enc_memmap = np.lib.format.open_memmap(
+            self.encodings_file, mode='w+',
+            dtype=np.float32, shape=(len(jobs), 128)
+        )
+        self._enc_count = 0
+
+        # Détecter en parallèle sur tous les cœurs (la détection dlib
+        # n'utilise qu'un seul cœur par appel), puis calculer les
+        # descripteurs par lots: un seul appel dlib pour tout le lot
+        batch = []
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for person_name, image, location, image_name in executor.map(
+                    _detect_one, jobs, chunksize=4):
+                if location is not None:
+                    batch.append((person_name, image, location))
+                    print(f"  ✓ {person_name}: {image_name}")
+                    if len(batch) >= ENCODE_BATCH_SIZE:
+                        self._encode_batch(batch)
+                        batch = []
+                elif image is not None:
+                    print(f"  ⚠️ Aucun visage détecté dans {image_name}")
+        if batch:
+            self._encode_batch(batch)
+
+        # Finaliser: retailler la matrice au nombre de visages encodés
+        # et sauvegarder les noms
+        count = self._enc_count
+        if count:
+            matrix = np.array(self._enc_memmap[:count])
+            self._enc_memmap.flush()
+            self._enc_memmap = None
+            if count < len(jobs):
+                np.save(self.encodings_file, matrix)
+            self.known_encodings_matrix = matrix
+            self.known_face_names_arr = np.asarray(
+                self.known_face_names, dtype=object
+            )
+            np.save(self.names_file, self.known_face_names_arr)
+            print(f"✓ {count} encodages sauvegardés")
         else:
+            self._enc_memmap = None
+            os.remove(self.encodings_file)
             print("⚠️ Aucun visage n'a été encodé")
+
+        self._precompute_match_state()
+
+    def _encode_batch(self, batch):
+        """
+        Calcule les descripteurs d'un lot de visages en un seul appel dlib
+
+        Args:
+            batch: Liste de tuples (nom, image RGB, localisation du visage)
+        """
+        images = [image for _, image, _ in batch]
+
+        # La surcharge batchée de compute_face_descriptor attend une
+        # liste de conteneurs full_object_detections (un par image),
+        # pas des full_object_detection nus
+        landmarks = []
+        for _, image, location in batch:
+            shapes = dlib.full_object_detections()
+            shapes.append(
+                face_recognition.api._raw_face_landmarks(image, [location])[0]
+            )
+            landmarks.append(shapes)
+
+        descriptors = face_recognition.api.face_encoder.compute_face_descriptor(
+            images, landmarks, 1
+        )
+        # Le retour est une liste de descripteurs par image (un seul
+        # visage par image ici, d'où l'indice 0)
+        for (person_name, _, _), image_descriptors in zip(batch, descriptors):
+            self._enc_memmap[self._enc_count] = np.asarray(
+                image_descriptors[0], dtype=np.float32
+            )
+            self._enc_count += 1
+            self.known_face_names.append(person_name)
+
+        # Flusher à chaque lot: le travail déjà fait survit à un crash
+        self._enc_memmap.flush()
     
     def recognize_faces_in_frame(self, frame):
         """
@@ -102,91 +376,258 @@ class FaceRecognitionSystem:
         Returns:
             tuple: (frame annoté, liste des noms détectés)
         """
-        # Convertir BGR (OpenCV) en RGB (face_recognition)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Réduire la taille pour accélérer le traitement
-        small_frame = cv2.resize(rgb_frame, (0, 0), fx=0.25, fy=0.25)
-        
-        # Détecter les visages
-        face_locations = face_recognition.face_locations(small_frame)
-        face_encodings = face_recognition.face_encodings(small_frame, face_locations)
-        
-        face_names = []
-        
-        for face_encoding in face_encodings:
-            # Comparer avec les visages connus
-            matches = face_recognition.compare_faces(
-                self.known_face_encodings, 
-                face_encoding, 
-                tolerance=self.tolerance
-            )
-            name = "Inconnu"
-            
-            # Calculer les distances
-            if self.known_face_encodings:
-                face_distances = face_recognition.face_distance(
-                    self.known_face_encodings, 
-                    face_encoding
-                )
-                best_match_index = np.argmin(face_distances)
-                
-                if matches[best_match_index]:
-                    name = self.known_face_names[best_match_index]
-                    confidence = (1 - face_distances[best_match_index]) * 100
-                    name = f"{name} ({confidence:.1f}%)"
-            
-            face_names.append(name)
-        
+        # Réduire la taille d'abord (1/16 des pixels à traiter)
+        small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
+
+        # Barrière de contenu: si la scène n'a presque pas changé depuis
+        # la dernière détection, réutiliser les boîtes et noms du dernier
+        # passage au lieu de relancer détection et encodage
+        gray_small = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+        tiny_gray = cv2.resize(gray_small, (32, 32)).astype(np.int16)
+
+        if (self._last_tiny_gray is not None
+                and np.abs(tiny_gray - self._last_tiny_gray).mean()
+                < FRAME_DIFF_THRESHOLD):
+            face_locations, face_names = self._last_detection
+        else:
+            # Le détecteur HOG ne regarde que les gradients: lui donner
+            # directement le gris évite de parcourir trois canaux
+            face_locations = face_recognition.face_locations(gray_small)
+
+            # Convertir BGR→RGB par inversion de canaux sur le petit
+            # buffer (l'encodeur, lui, exige la couleur); dlib veut un
+            # buffer contigu, d'où le ascontiguousarray
+            rgb_small = np.ascontiguousarray(small_frame[:, :, ::-1])
+            face_encodings = face_recognition.face_encodings(rgb_small, face_locations)
+
+            face_names = self._match_encodings(face_encodings)
+            self._last_detection = (face_locations, face_names)
+            # Mémoriser la vignette de la frame effectivement détectée:
+            # comparer à la frame précédente laisserait passer tout
+            # mouvement lent sans jamais redéclencher la détection
+            self._last_tiny_gray = tiny_gray
+
         # Dessiner les rectangles et noms sur l'image
-        for (top, right, bottom, left), name in zip(face_locations, face_names):
-            # Échelle inverse (on avait réduit à 25%)
-            top *= 4
-            right *= 4
-            bottom *= 4
-            left *= 4
-            
-            # Dessiner le rectangle
-            color = (0, 255, 0) if "Inconnu" not in name else (0, 0, 255)
-            cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
-            
-            # Dessiner le nom
-            cv2.rectangle(frame, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
-            cv2.putText(frame, name, (left + 6, bottom - 6), 
-                       cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
-        
+        frame = self._annotate_frame(frame, small_frame, face_locations, face_names)
+
         return frame, face_names
-    
+
+    def recognize_faces_in_batch(self, frames):
+        """
+        Détecte et reconnaît les visages d'un lot de frames (CNN sur GPU)
+
+        Args:
+            frames: Liste d'images BGR de même taille
+
+        Returns:
+            list: Tuples (frame annoté, noms détectés) pour chaque frame
+        """
+        small_frames = [cv2.resize(f, (0, 0), fx=0.25, fy=0.25) for f in frames]
+        rgb_smalls = [np.ascontiguousarray(s[:, :, ::-1]) for s in small_frames]
+
+        # Une seule passe CNN batchée pour tout le lot de frames
+        batch_locations = face_recognition.batch_face_locations(
+            rgb_smalls, number_of_times_to_upsample=0, batch_size=len(rgb_smalls)
+        )
+
+        results = []
+        for frame, small_frame, rgb_small, face_locations in zip(
+                frames, small_frames, rgb_smalls, batch_locations):
+            face_encodings = face_recognition.face_encodings(rgb_small, face_locations)
+            face_names = self._match_encodings(face_encodings)
+            frame = self._annotate_frame(frame, small_frame, face_locations, face_names)
+            results.append((frame, face_names))
+
+        return results
+
+    def _annotate_frame(self, frame, small_frame, face_locations, face_names):
+        """
+        Dessine les rectangles et noms sur l'image pleine taille
+
+        Args:
+            frame: Image BGR pleine taille
+            small_frame: Image réduite où les visages ont été détectés
+            face_locations: Boîtes (top, right, bottom, left) en coordonnées réduites
+            face_names: Noms correspondants
+
+        Returns:
+            np.ndarray: Image annotée
+        """
+        # Échelle inverse calculée à partir des dimensions réelles
+        scale_x = frame.shape[1] / small_frame.shape[1]
+        scale_y = frame.shape[0] / small_frame.shape[0]
+
+        if face_locations:
+            # Phase d'annotation sur UMat: OpenCV peut déporter les
+            # tracés vers le GPU via OpenCL (T-API)
+            canvas = cv2.UMat(frame)
+
+            for (top, right, bottom, left), name in zip(face_locations, face_names):
+                top = int(top * scale_y)
+                right = int(right * scale_x)
+                bottom = int(bottom * scale_y)
+                left = int(left * scale_x)
+
+                # Dessiner le rectangle
+                color = (0, 255, 0) if "Inconnu" not in name else (0, 0, 255)
+                cv2.rectangle(canvas, (left, top), (right, bottom), color, 2)
+
+                # Dessiner le nom
+                cv2.rectangle(canvas, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
+                cv2.putText(canvas, name, (left + 6, bottom - 6),
+                           cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
+
+            frame = canvas.get()
+
+        return frame
+
+    def _match_encodings(self, face_encodings):
+        """
+        Associe chaque encodage détecté au visage connu le plus proche
+
+        Args:
+            face_encodings: Liste des encodages détectés dans l'image
+
+        Returns:
+            list: Noms (avec confiance) ou "Inconnu" pour chaque encodage
+        """
+        if not face_encodings or not self.known_encodings_matrix.size:
+            return ["Inconnu"] * len(face_encodings)
+
+        face_names = []
+
+        # Comparer tous les visages détectés d'un coup:
+        # ||q - k||² = ||q||² + ||k||² - 2 q·kᵀ, soit un seul produit
+        # matriciel BLAS au lieu d'une boucle Python par visage
+        n_known = len(self.known_encodings_matrix)
+        use_prefilter = n_known >= INT8_PREFILTER_MIN_N
+
+        if self._faiss_index is not None:
+            # Recherche du plus proche voisin via l'index FAISS
+            # (distances carrées L2, comme les autres chemins)
+            Q = np.ascontiguousarray(
+                np.asarray(face_encodings, dtype=np.float32)
+            )
+            d2, idx = self._faiss_index.search(Q, 1)
+            best = idx[:, 0]
+            best_d2 = d2[:, 0]
+        elif _MATCH_LIB is not None and len(face_encodings) == 1:
+            # Noyau C AVX2: soustraction/FMA/réduction à la main,
+            # requête chargée une fois dans les registres
+            query = np.ascontiguousarray(face_encodings[0], dtype=np.float32)
+            best_i, best_dist2 = _best_match_native(
+                np.asarray(self.known_encodings_matrix), query
+            )
+            best = np.array([best_i])
+            best_d2 = np.array([best_dist2])
+        elif NUMBA_AVAILABLE and len(face_encodings) == 1 and not use_prefilter:
+            # Cas courant d'un seul visage: noyau JIT qui fusionne
+            # soustraction, carré et argmin en une seule passe
+            query = np.asarray(face_encodings[0], dtype=np.float32)
+            best_i, best_dist2 = _best_match(
+                np.asarray(self.known_encodings_matrix), query
+            )
+            best = np.array([best_i])
+            best_d2 = np.array([best_dist2])
+        elif use_prefilter:
+            # Grande galerie: pré-filtre en arithmétique entière sur la
+            # version quantifiée, puis re-classement exact en float32
+            # des meilleurs candidats seulement. Le score ||k||² - 2 q·k
+            # est la distance carrée à ||q||² près (constant par ligne),
+            # donc le classement entier est un vrai ordre de proximité
+            Q = np.asarray(face_encodings, dtype=np.float32)
+            q8 = np.clip(
+                np.round(Q / self._q_scale), -127, 127
+            ).astype(np.int32)
+            d2q = self._k_int8_sq[None, :] - 2 * (q8 @ self._k_int8_t)
+            top = min(INT8_PREFILTER_TOP, n_known)
+            cand = np.argpartition(d2q, top - 1, axis=1)[:, :top]
+            diff = self.known_encodings_matrix[cand] - Q[:, None, :]
+            d2c = np.einsum('mkj,mkj->mk', diff, diff)
+            sel = d2c.argmin(axis=1)
+            rows = np.arange(len(Q))
+            best = cand[rows, sel]
+            best_d2 = d2c[rows, sel]
+        else:
+            Q = np.asarray(face_encodings, dtype=np.float32)
+            q_sq = np.einsum('ij,ij->i', Q, Q)[:, None]
+            cross = Q @ self.known_encodings_matrix.T
+            d2 = q_sq + self._k_sq[None, :] - 2 * cross
+            best = d2.argmin(axis=1)
+            best_d2 = d2[np.arange(len(Q)), best]
+
+        tolerance2 = self.tolerance ** 2
+        for name, dist2 in zip(self.known_face_names_arr[best], best_d2):
+            if dist2 < tolerance2:
+                confidence = int(round((1 - np.sqrt(max(dist2, 0.0))) * 100))
+                label = self._label_cache.get((name, confidence))
+                if label is None:
+                    label = f"{name} ({confidence}%)"
+                    self._label_cache[(name, confidence)] = label
+                face_names.append(label)
+            else:
+                face_names.append("Inconnu")
+
+        return face_names
+
     def start_video_recognition(self):
         """Démarre la reconnaissance faciale en temps réel via webcam"""
         print("\n🎥 Démarrage de la reconnaissance faciale...")
         print("Appuyez sur 'q' pour quitter")
         print("Appuyez sur 's' pour prendre une capture d'écran")
         
-        # Ouvrir la webcam
+        # Ouvrir la webcam en demandant directement une résolution
+        # raisonnable au pilote, plutôt que de redimensionner du 1080p
         video_capture = cv2.VideoCapture(0)
-        
+        video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        video_capture.set(cv2.CAP_PROP_FPS, 30)
+        video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
         if not video_capture.isOpened():
             print("❌ Impossible d'ouvrir la webcam")
             return
-        
+
+        # L'acquisition tourne dans un thread dédié: la boucle principale
+        # traite toujours l'image la plus fraîche, sans bloquer sur read()
+        grabber = _Grabber(video_capture)
+
         frame_count = 0
-        
+        detected_names = []
+        gpu_batch = []
+        last_names_count = -1
+        visages_label = ""
+
         try:
             while True:
-                # Capturer une image
-                ret, frame = video_capture.read()
-                
-                if not ret:
-                    print("❌ Impossible de lire l'image")
-                    break
-                
+                # Récupérer la dernière image capturée
+                frame = grabber.read_latest()
+
+                if frame is None:
+                    if not grabber.running:
+                        print("❌ Impossible de lire l'image")
+                        break
+                    cv2.waitKey(1)
+                    continue
+
+                if self.use_gpu:
+                    # Accumuler un lot puis lancer la détection CNN
+                    # batchée sur GPU; afficher la frame la plus fraîche
+                    gpu_batch.append(frame)
+                    if len(gpu_batch) >= GPU_BATCH_SIZE:
+                        results = self.recognize_faces_in_batch(gpu_batch)
+                        frame, detected_names = results[-1]
+                        gpu_batch = []
                 # Traiter une image sur deux pour améliorer les performances
-                if frame_count % 2 == 0:
+                elif frame_count % 2 == 0:
                     frame, detected_names = self.recognize_faces_in_frame(frame)
                 
-                # Afficher le nombre de visages détectés
-                cv2.putText(frame, f"Visages: {len(detected_names)}", (10, 30),
+                # Afficher le nombre de visages détectés (chaîne
+                # reconstruite seulement quand le compte change)
+                if len(detected_names) != last_names_count:
+                    last_names_count = len(detected_names)
+                    visages_label = f"Visages: {last_names_count}"
+                cv2.putText(frame, visages_label, (10, 30),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
                 
                 # Afficher l'image
@@ -206,26 +647,46 @@ class FaceRecognitionSystem:
         
         finally:
             # Libérer les ressources
+            grabber.stop()
             video_capture.release()
             cv2.destroyAllWindows()
             print("\n✓ Reconnaissance faciale arrêtée")
     
-    def recognize_in_image(self, image_path):
+    def recognize_in_image(self, image_path, max_dim=600):
         """
         Reconnaît les visages dans une image
-        
+
         Args:
             image_path (str): Chemin vers l'image
+            max_dim (int): Dimension maximale de traitement (redimensionne au-delà)
         """
         print(f"\n🖼️ Analyse de l'image: {image_path}")
-        
+
         # Charger l'image
         frame = cv2.imread(image_path)
-        
+
         if frame is None:
             print("❌ Impossible de charger l'image")
             return
+
+        # Limiter la taille de traitement: la détection croît avec le
+        # carré du côté de l'image. recognize_faces_in_frame travaille
+        # au quart de la résolution, le plafond ici vaut donc 4*max_dim
+        # pour que l'image effectivement détectée fasse ~max_dim
+        height, width = frame.shape[:2]
+        target = max_dim * 4
+        if max(height, width) > target:
+            ratio = target / max(height, width)
+            frame = cv2.resize(frame, (int(width * ratio), int(height * ratio)),
+                               interpolation=cv2.INTER_AREA)
         
+        # Réinitialiser la barrière de contenu: elle compare des frames
+        # consécutives d'un même flux, pas deux images indépendantes —
+        # sans cela, une photo ressemblant à la scène précédente
+        # hériterait silencieusement de ses boîtes et noms
+        self._last_tiny_gray = None
+        self._last_detection = ([], [])
+
         # Reconnaître les visages
         frame, detected_names = self.recognize_faces_in_frame(frame)
         
@@ -247,7 +708,7 @@ def main():
     # Créer le système de reconnaissance
     system = FaceRecognitionSystem(known_faces_dir="known_faces")
     
-    if not system.known_face_encodings:
+    if not system.known_face_names:
         print("\n⚠️ Aucun visage connu n'a été chargé!")
         print("📝 Instructions:")
         print("   1. Créez un dossier pour chaque personne dans 'known_faces/'")
@@ -277,8 +738,10 @@ def main():
         image_path = input("Chemin de l'image: ").strip()
         system.recognize_in_image(image_path)
     elif choice == "3":
-        if os.path.exists(system.encodings_file):
-            os.remove(system.encodings_file)
+        for cache_file in (system.encodings_file, system.names_file):
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+        system.known_face_names = []
         system.encode_known_faces()
         print("✓ Réencodage terminé")
     elif choice == "4":
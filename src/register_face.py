@@ -6,6 +6,7 @@ Capture des photos via webcam et les enregistre dans le répertoire approprié
 """
 
 import cv2
+import numpy as np
 import os
 from pathlib import Path
 import time
@@ -24,9 +25,61 @@ class FaceRegistration:
         self.known_faces_dir = Path(known_faces_dir)
         self.known_faces_dir.mkdir(exist_ok=True)
         
-        # Charger le classificateur de visages Haar Cascade
+        # Détecteur DNN YuNet (une seule passe réseau, plus rapide et plus
+        # robuste que Haar) si le modèle ONNX est disponible
+        self.detector = None
+        yunet_model = Path(__file__).parent / "face_detection_yunet.onnx"
+        if yunet_model.exists() and hasattr(cv2, 'FaceDetectorYN_create'):
+            self.detector = cv2.FaceDetectorYN_create(
+                str(yunet_model), "", (320, 240), 0.7
+            )
+
+        # Classificateur Haar Cascade en secours
         cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         self.face_cascade = cv2.CascadeClassifier(cascade_path)
+
+        # Buffer blanc réutilisé pour le flash visuel (alloué au premier usage)
+        self._flash = None
+
+    def _detect_faces(self, frame):
+        """
+        Détecte les visages dans une image
+
+        Args:
+            frame: Image BGR de la webcam
+
+        Returns:
+            list: Rectangles (x, y, w, h) des visages détectés
+        """
+        # Détecter sur une version réduite: le coût de la détection (et
+        # de la conversion en niveaux de gris) suit le nombre de pixels
+        small = cv2.resize(frame, (320, 240))
+        scale_x = frame.shape[1] / 320
+        scale_y = frame.shape[0] / 240
+
+        if self.detector is not None:
+            self.detector.setInputSize((320, 240))
+            _, faces = self.detector.detect(small)
+            if faces is None:
+                return []
+            return [
+                (int(face[0] * scale_x), int(face[1] * scale_y),
+                 int(face[2] * scale_x), int(face[3] * scale_y))
+                for face in faces
+            ]
+
+        # Secours Haar Cascade (nécessite une image en niveaux de gris)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return [
+            (int(x * scale_x), int(y * scale_y),
+             int(w * scale_x), int(h * scale_y))
+            for (x, y, w, h) in self.face_cascade.detectMultiScale(
+                gray,
+                scaleFactor=1.1,
+                minNeighbors=5,
+                minSize=(25, 25)
+            )
+        ]
     
     def capture_faces_from_webcam(self, person_name, num_photos=10):
         """
@@ -66,17 +119,12 @@ class FaceRegistration:
                     print("❌ Impossible de lire l'image")
                     break
                 
-                # Copie pour l'affichage
-                display_frame = frame.copy()
+                # Buffer d'affichage sur UMat: les tracés passent par la
+                # T-API d'OpenCV (OpenCL/GPU si disponible) sans copie CPU
+                display_frame = cv2.UMat(frame)
                 
                 # Détecter les visages
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.face_cascade.detectMultiScale(
-                    gray,
-                    scaleFactor=1.1,
-                    minNeighbors=5,
-                    minSize=(100, 100)
-                )
+                faces = self._detect_faces(frame)
                 
                 # Dessiner les rectangles autour des visages
                 for (x, y, w, h) in faces:
@@ -107,10 +155,11 @@ class FaceRegistration:
                         print(f"  ✓ Photo {photo_count}/{num_photos} sauvegardée: {filename}")
                         last_capture_time = current_time
                         
-                        # Flash visuel
-                        white_frame = display_frame.copy()
-                        white_frame[:] = (255, 255, 255)
-                        cv2.imshow(f'Enregistrement - {person_name}', white_frame)
+                        # Flash visuel (buffer blanc alloué une seule fois)
+                        if (self._flash is None
+                                or self._flash.shape != frame.shape):
+                            self._flash = np.full_like(frame, 255)
+                        cv2.imshow(f'Enregistrement - {person_name}', self._flash)
                         cv2.waitKey(100)
                     else:
                         print("  ⚠️ Aucun visage détecté. Réessayez.")
@@ -162,11 +211,10 @@ class FaceRegistration:
                     break
                 
                 # Détecter les visages
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(100, 100))
+                faces = self._detect_faces(frame)
                 
-                # Dessiner les rectangles
-                display_frame = frame.copy()
+                # Dessiner les rectangles (UMat: tracés via la T-API)
+                display_frame = cv2.UMat(frame)
                 for (x, y, w, h) in faces:
                     cv2.rectangle(display_frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
                 